@@ -36,10 +36,9 @@ def signal_handler(signum, frame):
     print(f"\nReceived signal {signum}. Cleaning up...")
     if proxy_process:
         stop_cloud_sql_proxy(proxy_process)
-    sys.exit(1)
-
-signal.signal(signal.SIGINT, signal_handler)
-signal.signal(signal.SIGTERM, signal_handler)
+        # Cleared so the finally/exit paths don't try to stop it a second time
+        proxy_process = None
+    sys.exit(128 + signum)
 
 def find_free_port():
     """Find a free port for the proxy"""
@@ -47,6 +46,19 @@ def find_free_port():
         s.bind(('', 0))
         return s.getsockname()[1]
 
+def wait_for_proxy(proxy_process, port, timeout=5):
+    """Wait until the proxy accepts TCP connections; return False if it exits or times out"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proxy_process.poll() is not None:
+            return False
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
 def start_cloud_sql_proxy():
     """Start Cloud SQL Proxy"""
     global proxy_process
@@ -74,9 +86,13 @@ def start_cloud_sql_proxy():
     print(f"Starting Cloud SQL Proxy on port {port}")
     
     proxy_process = subprocess.Popen(proxy_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    time.sleep(5)
     
-    if proxy_process.poll() is not None:
+    if not wait_for_proxy(proxy_process, port):
+        if proxy_process.poll() is None:
+            # Still running but never listened; don't leave it behind
+            stop_cloud_sql_proxy(proxy_process)
+            proxy_process = None
+            raise Exception(f"Cloud SQL Proxy did not accept connections on port {port}")
         _, stderr = proxy_process.communicate()
         raise Exception(f"Cloud SQL Proxy failed to start: {stderr.decode()}")
     
@@ -111,124 +127,142 @@ def test_connection(port):
         print(f"❌ Database connection failed: {str(e)}")
         return False, None, None
 
-def explore_database_structure(engine):
+def quote_identifier(name):
+    """Quote a table name for interpolation into SQL (identifiers can't be bound)"""
+    return '"' + name.replace('"', '""') + '"'
+
+def explore_database_structure(conn):
     """Explore the database structure and available tables"""
     try:
-        with engine.connect() as conn:
-            print("\n🔍 Exploring database structure...")
-            
-            # Get all tables
-            result = conn.execute(text("""
-                SELECT table_name 
-                FROM information_schema.tables 
-                WHERE table_schema = 'public' 
-                ORDER BY table_name
-            """))
-            tables = [row[0] for row in result]
-            
-            if not tables:
-                print("No tables found in the database")
-                return
-            
-            print(f"Found {len(tables)} tables:")
-            for table in tables:
-                print(f"  - {table}")
-            
-            return tables
-            
+        print("\n🔍 Exploring database structure...")
+        
+        # Get all tables
+        result = conn.execute(text("""
+            SELECT table_name 
+            FROM information_schema.tables 
+            WHERE table_schema = 'public' 
+            ORDER BY table_name
+        """))
+        tables = result.scalars().all()
+        
+        if not tables:
+            print("No tables found in the database")
+            return []
+        
+        print(f"Found {len(tables)} tables:")
+        for table in tables:
+            print(f"  - {table}")
+        
+        return tables
+        
     except Exception as e:
         print(f"❌ Error exploring database structure: {str(e)}")
-        return []
+        return None
 
-def check_table_data(engine, tables=None):
-    """Check what data is available in the tables"""
+def check_table_data(conn, tables):
+    """Check what data is available in the given tables"""
     try:
-        # Default tables to check if none provided
-        if tables is None:
-            tables_to_check = [
-                'schools',
-                'school_sources', 
-                'location_points',
-                'school_locations',
-                'school_directory',
-                'school_names',
-                'school_characteristics',
-                'school_grades_offered',
-                'school_enrollments',
-                'school_frl'
-            ]
-        else:
-            tables_to_check = tables
-        
         print(f"\n📊 Checking data in tables...")
         
-        with engine.connect() as conn:
-            data_summary = {}
-            
-            for table in tables_to_check:
-                try:
-                    # Check if table exists and get row count
-                    result = conn.execute(text(f"SELECT COUNT(*) FROM {table}"))
-                    count = result.scalar()
-                    data_summary[table] = count
-                    print(f"  {table}: {count:,} records")
-                    
-                    # If table has data, show a sample of column names
-                    if count > 0:
-                        columns_result = conn.execute(text(f"""
-                            SELECT column_name 
-                            FROM information_schema.columns 
-                            WHERE table_name = '{table}' 
-                            ORDER BY ordinal_position
-                        """))
-                        columns = [row[0] for row in columns_result]
-                        print(f"    Columns: {', '.join(columns[:5])}{'...' if len(columns) > 5 else ''}")
-                        
-                except Exception as e:
-                    data_summary[table] = 0
-                    print(f"  {table}: Table not found or error ({str(e)})")
+        data_summary = {}
+        
+        # Fetch the column count and first few column names for every
+        # table in one query rather than listing all columns per table.
+        # information_schema also lists tables we can't SELECT from, so
+        # check that here rather than let one of them fail the count query
+        columns_result = conn.execute(text("""
+            SELECT table_name,
+                   COUNT(*) AS column_count,
+                   (array_agg(column_name::text ORDER BY ordinal_position))[1:5] AS first_columns,
+                   has_table_privilege('public.' || quote_ident(table_name), 'SELECT') AS readable
+            FROM information_schema.columns
+            WHERE table_schema = 'public'
+            AND table_name = ANY(:tables)
+            GROUP BY table_name
+        """), {"tables": list(tables)})
+        table_columns = {row.table_name: row for row in columns_result}
+        
+        # Count rows in every readable table in a single round trip
+        existing_tables = [
+            table for table in tables
+            if table in table_columns and table_columns[table].readable
+        ]
+        row_counts = {}
+        if existing_tables:
+            counts_result = conn.execute(text(" UNION ALL ".join(
+                f'SELECT {index} AS table_index, COUNT(*) AS row_count FROM {quote_identifier(table)}'
+                for index, table in enumerate(existing_tables)
+            )))
+            row_counts = {existing_tables[row.table_index]: row.row_count for row in counts_result}
+        
+        for table in tables:
+            if table not in row_counts:
+                data_summary[table] = 0
+                if table in table_columns:
+                    print(f"  {table}: No SELECT privilege")
+                else:
+                    print(f"  {table}: Table not found")
+                continue
             
-            return data_summary
+            count = row_counts[table]
+            data_summary[table] = count
+            print(f"  {table}: {count:,} records")
             
+            # If table has data, show a sample of column names
+            if count > 0:
+                columns = table_columns[table]
+                print(f"    Columns: {', '.join(columns.first_columns)}{'...' if columns.column_count > 5 else ''}")
+        
+        return data_summary
+        
     except Exception as e:
         print(f"❌ Error checking table data: {str(e)}")
+        conn.rollback()
         return {}
 
-def sample_data_from_tables(engine, tables_with_data, sample_size=3):
+def sample_data_from_tables(conn, tables_with_data, sample_size=3):
     """Get sample data from tables that have records"""
     print(f"\n🔬 Sampling data from tables with records...")
     
     try:
-        with engine.connect() as conn:
-            for table, count in tables_with_data.items():
-                if count > 0:
-                    print(f"\n--- Sample from {table} ({count:,} total records) ---")
-                    try:
-                        result = conn.execute(text(f"SELECT * FROM {table} LIMIT {sample_size}"))
-                        rows = result.fetchall()
-                        columns = result.keys()
+        for table, count in tables_with_data.items():
+            if count > 0:
+                print(f"\n--- Sample from {table} ({count:,} total records) ---")
+                try:
+                    result = conn.execute(
+                        text(f"SELECT * FROM {quote_identifier(table)} LIMIT :limit"),
+                        {"limit": sample_size}
+                    )
+                    rows = result.fetchall()
+                    columns = result.keys()
+                    
+                    if rows:
+                        # Print header
+                        print(f"  {' | '.join(str(col)[:15].ljust(15) for col in columns)}")
+                        print(f"  {'-' * (16 * len(columns))}")
                         
-                        if rows:
-                            # Print header
-                            print(f"  {' | '.join(str(col)[:15].ljust(15) for col in columns)}")
-                            print(f"  {'-' * (16 * len(columns))}")
-                            
-                            # Print sample rows
-                            for row in rows:
-                                row_str = ' | '.join(str(val)[:15].ljust(15) if val is not None else 'NULL'.ljust(15) for val in row)
-                                print(f"  {row_str}")
-                        else:
-                            print("  No sample data available")
-                            
-                    except Exception as e:
-                        print(f"  Error sampling {table}: {str(e)}")
+                        # Print sample rows
+                        for row in rows:
+                            row_str = ' | '.join(str(val)[:15].ljust(15) if val is not None else 'NULL'.ljust(15) for val in row)
+                            print(f"  {row_str}")
+                    else:
+                        print("  No sample data available")
                         
+                except Exception as e:
+                    print(f"  Error sampling {table}: {str(e)}")
+                    # Otherwise every later sample fails with "current transaction is aborted"
+                    conn.rollback()
+                    
     except Exception as e:
         print(f"❌ Error sampling data: {str(e)}")
 
 def main():
     global proxy_process
     
+    # Registered here rather than at import so importing the module has no side effects
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+    
     try:
         print("🔍 Starting database connection test...")
         
@@ -247,18 +281,25 @@ def main():
         if not success:
             return 1
         
-        # Explore database structure
-        all_tables = explore_database_structure(engine)
-        
-        # Check data in tables
-        data_summary = check_table_data(engine, all_tables)
-        
-        # Sample data from tables that have records
-        tables_with_data = {k: v for k, v in data_summary.items() if v > 0}
-        if tables_with_data:
-            sample_data_from_tables(engine, tables_with_data)
-        else:
-            print("\n📭 No tables contain data yet.")
+        # All checks share one pooled connection instead of opening one each
+        with engine.connect() as conn:
+            # Explore database structure; stop here if it failed or found nothing
+            all_tables = explore_database_structure(conn)
+            if all_tables is None:
+                return 1
+            if not all_tables:
+                print("\n📭 No tables to check.")
+                return 0
+            
+            # Check data in tables
+            data_summary = check_table_data(conn, all_tables)
+            
+            # Sample data from tables that have records
+            tables_with_data = {k: v for k, v in data_summary.items() if v > 0}
+            if tables_with_data:
+                sample_data_from_tables(conn, tables_with_data)
+            else:
+                print("\n📭 No tables contain data yet.")
         
         print(f"\n✅ Database test completed successfully!")
         print(f"📈 Summary: Found {len(all_tables)} tables, {len(tables_with_data)} contain data")
@@ -280,6 +321,8 @@ def main():
             stop_cloud_sql_proxy(proxy_process)
 
 if __name__ == "__main__":
+    # Status lines use emoji; replace them rather than crash on non-UTF-8 consoles or pipes
+    sys.stdout.reconfigure(errors='replace')
     print("="*60)
     print("DATABASE CONNECTION TEST")
     print("="*60)
@@ -1,4 +1,5 @@
 import logging
+from functools import lru_cache
 from flask import current_app
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
@@ -6,6 +7,9 @@ from sqlalchemy.orm import sessionmaker
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Recycle pooled connections before server/proxy idle timeouts drop them
+POOL_RECYCLE_SECONDS = 1800
+
 def get_db_engine(db_type='nces'):
     if db_type == 'nces':
         db_uri = current_app.config['SQLALCHEMY_BINDS']['nces_data']
@@ -14,57 +18,64 @@ def get_db_engine(db_type='nces'):
     else:
         raise ValueError(f"Unknown database type: {db_type}")
     
-    logger.debug(f"Connecting to {db_type} database with URI: {db_uri}")
-    return create_engine(db_uri)
+    logger.debug("Connecting to %s database with URI: %s", db_type, db_uri)
+    return _get_engine_for_uri(db_uri)
+
+@lru_cache(maxsize=8)
+def _get_engine_for_uri(db_uri):
+    # One engine (and connection pool) per database for the life of the process,
+    # instead of a new pool for every fetch. Pooled connections can sit idle
+    # between requests, so check them on checkout and recycle them periodically
+    return create_engine(db_uri, pool_pre_ping=True, pool_recycle=POOL_RECYCLE_SECONDS)
+
+# Query constants are built once at import and reused across calls
+SCHOOL_ID_QUERY = text("SELECT id FROM schools WHERE ncessch = :ncessch")
+
+HISTORICAL_DATA_QUERY = text("""
+    SELECT m.school_id, m.school_year, m.grade, m.total_membership as total_enrollment,
+           'actual' as type
+    FROM membership_data m
+    WHERE m.school_id = :school_id
+    ORDER BY m.school_year, m.grade
+""")
+
+SCHOOL_INFO_QUERY = text("""
+    SELECT id, ncessch, school_name, lea_name, state_name, state_abbr
+    FROM schools
+    WHERE ncessch = :ncessch
+""")
 
 def get_school_id_from_ncessch(session, ncessch):
-    query = text("SELECT id FROM schools WHERE ncessch = :ncessch")
-    result = session.execute(query, {"ncessch": ncessch}).fetchone()
-    if result:
-        return result[0]
-    return None
+    # scalar() returns the id from the first row, or None when no school matches
+    return session.execute(SCHOOL_ID_QUERY, {"ncessch": ncessch}).scalar()
 
-def fetch_historical_data(ncessch: str):
+def fetch_historical_data(ncessch: str, school_id: int = None):
     engine = get_db_engine('nces')
     Session = sessionmaker(bind=engine)
 
     with Session() as session:
-        logger.debug(f"Fetching school ID for NCESSCH: {ncessch}")
-        school_id = get_school_id_from_ncessch(session, ncessch)
-        logger.debug(f"Retrieved school ID: {school_id}")
-
+        # Callers that already have the school row can pass its id and skip the lookup
         if school_id is None:
-            logger.debug(f"No school found for NCESSCH: {ncessch}")
-            return []
-
-        query = text("""
-            SELECT m.school_id, m.school_year, m.grade, m.total_membership as total_enrollment,
-                   'actual' as type
-            FROM membership_data m
-            WHERE m.school_id = :school_id
-            ORDER BY m.school_year, m.grade
-        """)
-
-        logger.debug(f"Executing query for school_id: {school_id}")
+            logger.debug("Fetching school ID for NCESSCH: %s", ncessch)
+            school_id = get_school_id_from_ncessch(session, ncessch)
+            logger.debug("Retrieved school ID: %s", school_id)
+
+            if school_id is None:
+                logger.debug("No school found for NCESSCH: %s", ncessch)
+                return []
+
+        logger.debug("Executing query for school_id: %s", school_id)
         try:
-            result = session.execute(query, {"school_id": school_id}).fetchall()
-            logger.debug(f"Query executed successfully. Number of rows: {len(result)}")
+            result = session.execute(HISTORICAL_DATA_QUERY, {"school_id": school_id}).mappings().all()
+            logger.debug("Query executed successfully. Number of rows: %s", len(result))
         except Exception as e:
-            logger.error(f"Error executing query: {str(e)}")
+            logger.error("Error executing query: %s", e)
             raise
 
-        historical_data = [
-            {
-                "school_id": row.school_id,
-                "school_year": row.school_year,
-                "grade": row.grade,
-                "total_enrollment": row.total_enrollment,
-                "type": row.type
-            }
-            for row in result
-        ]
+        # Selected column labels already match the keys callers expect
+        historical_data = [dict(row) for row in result]
 
-        logger.debug(f"Processed {len(historical_data)} records for school_id: {school_id}")
+        logger.debug("Processed %s records for school_id: %s", len(historical_data), school_id)
 
     return historical_data
 
@@ -73,32 +84,19 @@ def fetch_school_info(ncessch: str):
     Session = sessionmaker(bind=engine)
 
     with Session() as session:
-        query = text("""
-            SELECT id, ncessch, school_name, lea_name, state_name, state_abbr
-            FROM schools
-            WHERE ncessch = :ncessch
-        """)
-
-        logger.debug(f"Executing query for NCESSCH: {ncessch}")
+        logger.debug("Executing query for NCESSCH: %s", ncessch)
         try:
-            result = session.execute(query, {"ncessch": ncessch}).fetchone()
+            result = session.execute(SCHOOL_INFO_QUERY, {"ncessch": ncessch}).mappings().first()
             logger.debug("Query executed successfully")
         except Exception as e:
-            logger.error(f"Error executing query: {str(e)}")
+            logger.error("Error executing query: %s", e)
             raise
 
         if result:
-            school_info = {
-                "id": result.id,
-                "ncessch": result.ncessch,
-                "school_name": result.school_name,
-                "lea_name": result.lea_name,
-                "state_name": result.state_name,
-                "state_abbr": result.state_abbr,
-            }
-            logger.debug(f"Retrieved school info for NCESSCH: {ncessch}")
+            school_info = dict(result)
+            logger.debug("Retrieved school info for NCESSCH: %s", ncessch)
         else:
             school_info = None
-            logger.debug(f"No school info found for NCESSCH: {ncessch}")
+            logger.debug("No school info found for NCESSCH: %s", ncessch)
 
     return school_info
\ No newline at end of file
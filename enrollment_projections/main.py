@@ -6,7 +6,6 @@ from .survival_rates import calculate_survival_rates, calculate_forecast_surviva
 from .projections import calculate_entry_grade_estimates, generate_projections
 from .data_structures import SchoolData
 from .utils import GRADE_MAP, generate_forecast_years, get_most_recent_year
-import traceback
 import json
 from datetime import datetime
 
@@ -27,7 +26,7 @@ def serialize_for_log(obj):
 
 def generate_and_update_projections(ncessch: str, user_data: Dict[str, Any] = None) -> Dict[str, Any]:
     try:
-        current_app.logger.info(f"Starting generate_and_update_projections for ncessch: {ncessch}")
+        current_app.logger.info("Starting generate_and_update_projections for ncessch: %s", ncessch)
 
         # Log the raw user data first, if it exists
         if user_data is not None:
@@ -36,16 +35,18 @@ def generate_and_update_projections(ncessch: str, user_data: Dict[str, Any] = No
         else:
             current_app.logger.info("No user data provided, using historical data only.")
 
-        # Fetch historical data
-        with current_app.app_context():
-            historical_data = fetch_historical_data(ncessch)
-
         # Fetch school info
         with current_app.app_context():
             school_info = fetch_school_info(ncessch)
 
+        # Fetch historical data, reusing the school id instead of looking it up again
+        historical_data = None
+        if school_info:
+            with current_app.app_context():
+                historical_data = fetch_historical_data(ncessch, school_id=school_info['id'])
+
         if not historical_data or not school_info:
-            current_app.logger.error(f"No data found for school: {ncessch}")
+            current_app.logger.error("No data found for school: %s", ncessch)
             return {'error': 'No data found for the given school'}
 
         # Combine historical data with school info
@@ -128,10 +129,9 @@ def generate_and_update_projections(ncessch: str, user_data: Dict[str, Any] = No
             'entryGradeEstimates': school_data.get('entryGradeEstimates')
         }
 
-        current_app.logger.info(f"Projections generated successfully for school: {ncessch}")
+        current_app.logger.info("Projections generated successfully for school: %s", ncessch)
 
         return result
     except Exception as e:
-        current_app.logger.error(f"Error in generate_and_update_projections: {str(e)}")
-        current_app.logger.error(f"Traceback: {traceback.format_exc()}")
+        current_app.logger.exception("Error in generate_and_update_projections: %s", e)
         return {'error': str(e)}
\ No newline at end of file
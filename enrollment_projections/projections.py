@@ -89,6 +89,13 @@ def generate_projections(school_data: SchoolData, grade_map: Dict[str, int], for
     # Sort active grades by grade level
     latest_grades = sorted(active_grades, key=lambda x: grade_map.get(x, float('inf')))
     
+    # Every grade in latest_grades is active, so a grade's previous active grade
+    # is simply its predecessor in the sorted list; look it up once per school
+    previous_grades = {
+        grade: latest_grades[index - 1] if index > 0 else None
+        for index, grade in enumerate(latest_grades)
+    }
+    
     projections = {
         'min': {}, 'median': {}, 'max': {}, 'outer_min': {}, 'outer_max': {}
     }
@@ -103,7 +110,7 @@ def generate_projections(school_data: SchoolData, grade_map: Dict[str, int], for
     
     entry_grade_estimates = school_data.get('entryGradeEstimates', {})
     
-    for year in forecast_years:
+    for year_index, year in enumerate(forecast_years):
         for projection_type in ['min', 'median', 'max']:
             projections[projection_type][year] = {}
             
@@ -123,13 +130,7 @@ def generate_projections(school_data: SchoolData, grade_map: Dict[str, int], for
                             
                     rate = forecast_survival_rates.get(grade, {}).get(projection_type, 1)
                     
-                    # Find previous active grade
-                    grade_index = latest_grades.index(grade)
-                    previous_grade = None
-                    for prev_grade in reversed(latest_grades[:grade_index]):
-                        if prev_grade in active_grades:
-                            previous_grade = prev_grade
-                            break
+                    previous_grade = previous_grades[grade]
                     
                     if not previous_grade:
                         # Use historical patterns if no previous grade
@@ -145,11 +146,11 @@ def generate_projections(school_data: SchoolData, grade_map: Dict[str, int], for
                             last_actual = enrollment[latest_year].get(grade, 0)
                             value = max(0, last_actual) if last_actual is not None else 0
                     else:
-                        if year == forecast_years[0]:
+                        if year_index == 0:
                             prev_enrollment = enrollment[latest_year].get(previous_grade, 0)
                             value = max(0, prev_enrollment * rate) if prev_enrollment > 0 else 0
                         else:
-                            previous_year = forecast_years[forecast_years.index(year)-1]
+                            previous_year = forecast_years[year_index - 1]
                             prev_value = projections[projection_type][previous_year].get(previous_grade, 0)
                             value = max(0, prev_value * rate)
                 
@@ -9,7 +9,8 @@ import json
 from generate_projections_csv import (
     calculate_survival_rates, calculate_entry_grade_estimates, 
     calculate_forecast_survival_rates, generate_projections,
-    generate_forecast_years, get_most_recent_year, GRADE_MAP
+    generate_forecast_years, get_most_recent_year, format_projections_for_csv,
+    GRADE_MAP
 )
 
 class TestEdgeCases(unittest.TestCase):
@@ -312,6 +313,69 @@ class TestEdgeCases(unittest.TestCase):
         
         print("✅ Complex projection scenario handled correctly")
 
+    def test_format_projections_for_csv(self):
+        """Test CSV row formatting: shared timestamp, column order and per-grade columns"""
+        print("🧪 Testing CSV row formatting...")
+
+        school_data = {
+            'id': 'CSV001',
+            'ncessch': '123456789020',
+            'school_name': 'CSV Format School',
+            'entryGrade': 'Kindergarten',
+            'entryGradeEstimates': {'low': 20, 'median': 25, 'high': 30},
+            'forecastSurvivalRates': {
+                'Grade 1': {'min': 0.9, 'median': 0.95, 'max': 1.0}
+            },
+            'projections': {
+                'min': {'2022-2023': {'Kindergarten': 20, 'Grade 1': 21}},
+                'median': {'2022-2023': {'Kindergarten': 25, 'Grade 1': 23}},
+                'max': {'2022-2023': {'Kindergarten': 30, 'Grade 1': 25}},
+                'outer_min': {'2022-2023': {'Kindergarten': 18, 'Grade 1': 19}},
+                'outer_max': {'2022-2023': {'Kindergarten': 32, 'Grade 1': 27}}
+            }
+        }
+
+        rows = format_projections_for_csv(school_data, generated_at='2024-01-01T00:00:00')
+
+        # One row per projection type and grade, all stamped with the passed timestamp
+        self.assertEqual(len(rows), 10)
+        self.assertEqual({row['generated_at'] for row in rows}, {'2024-01-01T00:00:00'})
+
+        # Column order is what ends up in the CSV header
+        self.assertEqual(list(rows[0].keys()), [
+            'school_id', 'ncessch', 'school_name', 'entry_grade',
+            'projection_year', 'projection_type', 'grade', 'projected_enrollment',
+            'generated_at',
+            'survival_rate_min', 'survival_rate_median', 'survival_rate_max',
+            'entry_grade_low', 'entry_grade_high', 'entry_grade_median'
+        ])
+
+        # Entry grade carries the estimates but no survival rates
+        entry_row = next(row for row in rows if row['grade'] == 'Kindergarten' and row['projection_type'] == 'max')
+        self.assertEqual(entry_row['projected_enrollment'], 30)
+        self.assertEqual(
+            (entry_row['entry_grade_low'], entry_row['entry_grade_median'], entry_row['entry_grade_high']),
+            (20, 25, 30)
+        )
+        self.assertEqual(
+            (entry_row['survival_rate_min'], entry_row['survival_rate_median'], entry_row['survival_rate_max']),
+            ('', '', '')
+        )
+
+        # Non-entry grades carry survival rates but no entry estimates, for every projection type
+        for row in rows:
+            if row['grade'] == 'Grade 1':
+                self.assertEqual(
+                    (row['survival_rate_min'], row['survival_rate_median'], row['survival_rate_max']),
+                    (0.9, 0.95, 1.0)
+                )
+                self.assertEqual(
+                    (row['entry_grade_low'], row['entry_grade_median'], row['entry_grade_high']),
+                    ('', '', '')
+                )
+
+        print("✅ CSV rows formatted correctly")
+
 def main():
     print("=" * 60)
     print("COMPREHENSIVE EDGE CASE TESTS")